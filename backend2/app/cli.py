@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List, Optional
+
+from .services.export_service import (
+    DATASETS,
+    FORMATS,
+    ExportError,
+    export_filename,
+    export_stream,
+    parse_time,
+    resolve_device_ids,
+    resolve_format,
+)
+
+
+def _parse_time(value: str) -> str:
+    try:
+        return parse_time(value)
+    except ExportError:
+        raise argparse.ArgumentTypeError(f"invalid ISO timestamp: {value}")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Secure Edge Device Manager utilities")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Export stored metric samples or logs")
+    export.add_argument("dataset", choices=sorted(DATASETS))
+    export.add_argument("--format", dest="fmt", choices=sorted(FORMATS), help="defaults to parquet when pyarrow is installed")
+    export.add_argument("--start", type=_parse_time, help="inclusive ISO timestamp (UTC unless an offset is given)")
+    export.add_argument("--end", type=_parse_time, help="exclusive ISO timestamp (UTC unless an offset is given)")
+    export.add_argument("--device", dest="device_ids", action="append", default=[], help="device id, repeatable")
+    export.add_argument("--group", help="export every device in this group")
+    export.add_argument("--output", "-o", help="output file, '-' for stdout (default: generated name)")
+    return parser
+
+
+def _export(args: argparse.Namespace) -> int:
+    try:
+        fmt = resolve_format(args.fmt)
+        device_ids = resolve_device_ids(args.device_ids, args.group)
+    except ExportError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+    chunks = export_stream(args.dataset, fmt, args.start, args.end, device_ids)
+    if args.output == "-":
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+        return 0
+
+    path = args.output or export_filename(args.dataset, fmt)
+    written = 0
+    with open(path, "wb") as handle:
+        for chunk in chunks:
+            handle.write(chunk)
+            written += len(chunk)
+    print(f"Wrote {written} bytes to {path}", file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    if args.command == "export":
+        return _export(args)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
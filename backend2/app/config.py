@@ -10,7 +10,13 @@ class Settings(BaseModel):
     database_name: str = os.getenv("MONGODB_DB", "edge-device-manager")
     api_prefix: str = "/api"
     websocket_path: str = "/ws/terminal"
+    alerts_websocket_path: str = "/ws/alerts"
+    exec_websocket_path: str = "/ws/exec/{job_id}"
+    exec_output_limit: int = 65536
     ssh_connect_timeout: int = 10
+    metrics_interval_seconds: int = int(os.getenv("METRICS_INTERVAL_SECONDS", "30"))
+    collector_workers: int = int(os.getenv("COLLECTOR_WORKERS", "32"))
+    history_retention_days: int = int(os.getenv("HISTORY_RETENTION_DAYS", "90"))
 
 @lru_cache
 def get_settings() -> Settings:
@@ -20,3 +20,18 @@ def get_database() -> Database:
 
 def get_devices_collection() -> Collection:
     return get_database().get_collection("devices")
+
+def get_alert_rules_collection() -> Collection:
+    return get_database().get_collection("alert_rules")
+
+def get_alerts_collection() -> Collection:
+    return get_database().get_collection("alerts")
+
+def get_exec_jobs_collection() -> Collection:
+    return get_database().get_collection("exec_jobs")
+
+def get_metric_samples_collection() -> Collection:
+    return get_database().get_collection("metric_samples")
+
+def get_device_logs_collection() -> Collection:
+    return get_database().get_collection("device_logs")
@@ -7,10 +7,22 @@ from typing import Any, Dict
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pymongo import ASCENDING
+from pymongo.collection import Collection
 
 from .config import get_settings
-from .db import get_devices_collection
+from .db import (
+    get_alerts_collection,
+    get_device_logs_collection,
+    get_devices_collection,
+    get_exec_jobs_collection,
+    get_metric_samples_collection,
+)
+from .routes.alerts import router as alerts_router
 from .routes.devices import router as devices_router
+from .routes.export import router as export_router
+from .services.alerts_service import get_alert_engine
+from .services.collector_service import get_metrics_collector
+from .services.exec_service import find_job, get_exec_runner, serialize_job
 from .utils.ssh import SSHError, create_ssh_client
 
 settings = get_settings()
@@ -26,10 +38,40 @@ app.add_middleware(
 )
 
 
+def _ensure_ttl_index(collection: Collection, field: str, expire_after: int) -> None:
+    # TTL indexes need a BSON date, so retention keys off recordedAt rather than the ISO timestamp.
+    # create_index rejects a changed expireAfterSeconds on an existing index, so update it in place.
+    for name, info in collection.index_information().items():
+        if info.get("key") == [(field, ASCENDING)]:
+            if info.get("expireAfterSeconds") != expire_after:
+                collection.database.command(
+                    {
+                        "collMod": collection.name,
+                        "index": {"keyPattern": {field: ASCENDING}, "expireAfterSeconds": expire_after},
+                    }
+                )
+            return
+    collection.create_index([(field, ASCENDING)], expireAfterSeconds=expire_after)
+
+
 @app.on_event("startup")
 def startup_event() -> None:
     collection = get_devices_collection()
     collection.create_index([("host", ASCENDING), ("port", ASCENDING)])
+    alerts = get_alerts_collection()
+    alerts.create_index([("state", ASCENDING), ("deviceId", ASCENDING)])
+    alerts.create_index([("firedAt", ASCENDING)])
+    get_exec_jobs_collection().create_index([("createdAt", ASCENDING)])
+    for history in (get_metric_samples_collection(), get_device_logs_collection()):
+        history.create_index([("timestamp", ASCENDING)])
+        history.create_index([("deviceId", ASCENDING), ("timestamp", ASCENDING)])
+        _ensure_ttl_index(history, "recordedAt", settings.history_retention_days * 24 * 60 * 60)
+    get_metrics_collector().start()
+
+
+@app.on_event("shutdown")
+def shutdown_event() -> None:
+    get_metrics_collector().stop()
 
 
 @app.get("/api/health")
@@ -44,6 +86,8 @@ def health_check() -> Dict[str, Any]:
 
 
 app.include_router(devices_router)
+app.include_router(alerts_router)
+app.include_router(export_router)
 
 
 async def _stream_channel(websocket: WebSocket, channel) -> None:
@@ -112,3 +156,49 @@ async def terminal_websocket(websocket: WebSocket) -> None:
         if ssh_client:
             ssh_client.close()
         await websocket.close()
+
+
+@app.websocket(settings.alerts_websocket_path)
+async def alerts_websocket(websocket: WebSocket) -> None:
+    await websocket.accept()
+    broadcaster = get_alert_engine().broadcaster
+    queue = broadcaster.subscribe()
+    try:
+        while True:
+            event = await queue.get()
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broadcaster.unsubscribe(queue)
+
+
+@app.websocket(settings.exec_websocket_path)
+async def exec_websocket(websocket: WebSocket, job_id: str) -> None:
+    await websocket.accept()
+    # Subscribe before reading the snapshot so no output falls between the two.
+    broadcaster = get_exec_runner().get_broadcaster(job_id)
+    queue = broadcaster.subscribe() if broadcaster else None
+
+    try:
+        doc = await asyncio.to_thread(find_job, job_id)
+        if not doc:
+            await websocket.send_json({"type": "error", "error": "Command job not found"})
+            return
+        await websocket.send_json({"type": "job", "data": serialize_job(doc)})
+        if queue is None or doc.get("status") in ("completed", "aborted", "failed"):
+            return
+        while True:
+            event = await queue.get()
+            await websocket.send_json(event)
+            if event["type"] == "status":
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if broadcaster and queue:
+            broadcaster.unsubscribe(queue)
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 from bson import ObjectId
 from pydantic import BaseModel, Field
 
@@ -24,6 +24,7 @@ class DeviceBase(BaseModel):
     username: str
     password: str
     description: Optional[str] = ""
+    group: Optional[str] = ""
 
 class DeviceCreate(DeviceBase):
     pass
@@ -49,3 +50,22 @@ class DeviceMetrics(BaseModel):
 
 class LogsResponse(BaseModel):
     logs: list
+
+class AlertRuleCreate(BaseModel):
+    name: str
+    metric: Literal["cpu.usedPercent", "memory.usedPercent", "disk.usedPercent", "offline"]
+    operator: Literal[">", ">=", "<", "<=", "=="] = ">"
+    threshold: float = 0
+    forSeconds: int = Field(default=0, ge=0)
+    deviceId: Optional[str] = None
+    group: Optional[str] = None
+    enabled: bool = True
+
+class ExecJobCreate(BaseModel):
+    command: str = Field(min_length=1)
+    deviceIds: List[str] = Field(default_factory=list)
+    group: Optional[str] = None
+    parallelism: int = Field(default=10, ge=1, le=100)
+    timeoutSeconds: int = Field(default=60, ge=1, le=3600)
+    batchSize: Optional[int] = Field(default=None, ge=1)
+    stopOnFailure: bool = False
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Query, status
+
+from ..db import get_alert_rules_collection, get_alerts_collection
+from ..models import AlertRuleCreate
+from ..services.alerts_service import get_alert_engine, serialize_alert, serialize_rule
+
+router = APIRouter(prefix="/api/alerts", tags=["alerts"])
+
+
+@router.get("/")
+def list_alerts(
+    state: Optional[str] = Query(default=None),
+    device_id: Optional[str] = Query(default=None, alias="deviceId"),
+    limit: int = Query(default=100, ge=1, le=1000),
+) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    if state:
+        query["state"] = state
+    if device_id:
+        query["deviceId"] = device_id
+    cursor = get_alerts_collection().find(query).sort("firedAt", -1).limit(limit)
+    alerts = [serialize_alert(doc) for doc in cursor]
+    return {"statusCode": 200, "data": alerts, "message": "Alerts retrieved successfully", "success": True}
+
+
+@router.get("/rules")
+def list_rules() -> Dict[str, Any]:
+    rules = [serialize_rule(doc) for doc in get_alert_rules_collection().find().sort("createdAt", -1)]
+    return {"statusCode": 200, "data": rules, "message": "Alert rules retrieved successfully", "success": True}
+
+
+@router.post("/rules", status_code=status.HTTP_201_CREATED)
+def create_rule(payload: AlertRuleCreate) -> Dict[str, Any]:
+    collection = get_alert_rules_collection()
+    rule_data = payload.dict()
+    rule_data["createdAt"] = datetime.utcnow().isoformat()
+    collection.insert_one(rule_data)
+    get_alert_engine().reload_rules()
+    return {"statusCode": 201, "data": serialize_rule(rule_data), "message": "Alert rule added successfully", "success": True}
+
+
+@router.delete("/rules/{rule_id}")
+def delete_rule(rule_id: str) -> Dict[str, Any]:
+    collection = get_alert_rules_collection()
+    try:
+        result = collection.delete_one({"_id": ObjectId(rule_id)})
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert rule not found")
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert rule not found")
+    get_alert_engine().remove_rule(rule_id)
+    return {"statusCode": 200, "data": None, "message": "Alert rule deleted successfully", "success": True}
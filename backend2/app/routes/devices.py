@@ -4,32 +4,18 @@ from datetime import datetime
 from typing import Any, Dict, List
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 
-from ..db import get_devices_collection
-from ..models import DeviceCreate
-from ..services.metrics_service import collect_metrics
+from ..db import get_devices_collection, get_exec_jobs_collection
+from ..models import DeviceCreate, ExecJobCreate
+from ..services.alerts_service import get_alert_engine
+from ..services.collector_service import get_metrics_collector, serialize_device
+from ..services.exec_service import find_job, get_exec_runner, serialize_job
 from ..services.logs_service import fetch_logs
 
 router = APIRouter(prefix="/api/devices", tags=["devices"])
 
 
-def _serialize_device(doc: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "id": str(doc.get("_id")),
-        "name": doc.get("name"),
-        "host": doc.get("host"),
-        "port": doc.get("port"),
-        "username": doc.get("username"),
-        "password": doc.get("password"),
-        "description": doc.get("description", ""),
-        "createdAt": doc.get("createdAt"),
-        "updatedAt": doc.get("updatedAt"),
-        "status": doc.get("status", "unknown"),
-        "lastSeen": doc.get("lastSeen"),
-    }
-
-
 def _get_device_or_404(device_id: str) -> Dict[str, Any]:
     collection = get_devices_collection()
     try:
@@ -44,14 +30,66 @@ def _get_device_or_404(device_id: str) -> Dict[str, Any]:
 @router.get("/")
 def list_devices() -> Dict[str, List[Dict[str, Any]]]:
     collection = get_devices_collection()
-    devices = [_serialize_device(doc) for doc in collection.find().sort("createdAt", -1)]
+    devices = [serialize_device(doc) for doc in collection.find().sort("createdAt", -1)]
     return {"statusCode": 200, "data": devices, "message": "Devices retrieved successfully", "success": True}
 
 
+@router.post("/exec", status_code=status.HTTP_202_ACCEPTED)
+def create_exec_job(payload: ExecJobCreate) -> Dict[str, Any]:
+    selectors: List[Dict[str, Any]] = []
+    if payload.deviceIds:
+        try:
+            selectors.append({"_id": {"$in": [ObjectId(device_id) for device_id in payload.deviceIds]}})
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid device id")
+    if payload.group:
+        selectors.append({"group": payload.group})
+    if not selectors:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Select devices by deviceIds or group")
+
+    devices = [serialize_device(doc) for doc in get_devices_collection().find({"$or": selectors})]
+    if not devices:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No matching devices")
+
+    collection = get_exec_jobs_collection()
+    job = payload.dict()
+    job.update(
+        {
+            "deviceIds": [device["id"] for device in devices],
+            "status": "queued",
+            "total": len(devices),
+            "completed": 0,
+            "failed": 0,
+            "results": {},
+            "createdAt": datetime.utcnow().isoformat(),
+            "startedAt": None,
+            "finishedAt": None,
+        }
+    )
+    collection.insert_one(job)
+    get_exec_runner().start(job, devices)
+    return {"statusCode": 202, "data": serialize_job(job), "message": "Command job started", "success": True}
+
+
+@router.get("/exec")
+def list_exec_jobs(limit: int = Query(default=50, ge=1, le=500)) -> Dict[str, Any]:
+    cursor = get_exec_jobs_collection().find({}, {"results": 0}).sort("createdAt", -1).limit(limit)
+    jobs = [serialize_job(doc, include_results=False) for doc in cursor]
+    return {"statusCode": 200, "data": jobs, "message": "Command jobs retrieved successfully", "success": True}
+
+
+@router.get("/exec/{job_id}")
+def get_exec_job(job_id: str) -> Dict[str, Any]:
+    doc = find_job(job_id)
+    if not doc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Command job not found")
+    return {"statusCode": 200, "data": serialize_job(doc), "message": "Command job retrieved successfully", "success": True}
+
+
 @router.get("/{device_id}")
 def get_device(device_id: str) -> Dict[str, Any]:
     doc = _get_device_or_404(device_id)
-    return {"statusCode": 200, "data": _serialize_device(doc), "message": "Device retrieved successfully", "success": True}
+    return {"statusCode": 200, "data": serialize_device(doc), "message": "Device retrieved successfully", "success": True}
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
@@ -62,7 +100,7 @@ def create_device(payload: DeviceCreate) -> Dict[str, Any]:
     device_data.update({"status": "unknown", "lastSeen": None, "createdAt": now, "updatedAt": now})
     result = collection.insert_one(device_data)
     inserted = collection.find_one({"_id": result.inserted_id})
-    return {"statusCode": 201, "data": _serialize_device(inserted), "message": "Device added successfully", "success": True}
+    return {"statusCode": 201, "data": serialize_device(inserted), "message": "Device added successfully", "success": True}
 
 
 @router.delete("/{device_id}")
@@ -74,23 +112,19 @@ def delete_device(device_id: str) -> Dict[str, Any]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
     if result.deleted_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device not found")
+    get_metrics_collector().forget(device_id)
+    get_alert_engine().remove_device(device_id)
     return {"statusCode": 200, "data": None, "message": "Device deleted successfully", "success": True}
 
 
 @router.get("/{device_id}/metrics")
 def get_device_metrics(device_id: str) -> Dict[str, Any]:
-    collection = get_devices_collection()
     doc = _get_device_or_404(device_id)
-    device = _serialize_device(doc)
-    metrics = collect_metrics(device)
-
-    status_payload = metrics.get("status", {})
-    update_doc = {
-        "status": "online" if status_payload.get("online") else "offline",
-        "lastSeen": status_payload.get("lastSeen"),
-        "updatedAt": datetime.utcnow().isoformat(),
-    }
-    collection.update_one({"_id": ObjectId(device_id)}, {"$set": update_doc})
+    collector = get_metrics_collector()
+    metrics = collector.latest(device_id)
+    if metrics is None:
+        # Devices added since the last cycle are collected once on first view.
+        metrics = collector.collect_device(serialize_device(doc))
 
     return {"statusCode": 200, "data": metrics, "message": "Metrics retrieved successfully", "success": True}
 
@@ -98,6 +132,6 @@ def get_device_metrics(device_id: str) -> Dict[str, Any]:
 @router.get("/{device_id}/logs")
 def get_device_logs(device_id: str) -> Dict[str, Any]:
     doc = _get_device_or_404(device_id)
-    device = _serialize_device(doc)
+    device = serialize_device(doc)
     logs = fetch_logs(device)
     return {"statusCode": 200, "data": logs, "message": "Logs retrieved successfully", "success": True}
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from ..services.export_service import (
+    DATASETS,
+    FORMATS,
+    ExportError,
+    export_filename,
+    export_stream,
+    parse_time,
+    resolve_device_ids,
+    resolve_format,
+)
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+
+def _normalize_time(value: Optional[str], name: str) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        return parse_time(value)
+    except ExportError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid {name} timestamp")
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: str,
+    fmt: Optional[str] = Query(default=None, alias="format"),
+    start: Optional[str] = Query(default=None),
+    end: Optional[str] = Query(default=None),
+    device_ids: List[str] = Query(default=[], alias="deviceId"),
+    group: Optional[str] = Query(default=None),
+) -> StreamingResponse:
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown export dataset")
+    try:
+        fmt = resolve_format(fmt)
+    except ExportError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    try:
+        selected = resolve_device_ids(device_ids, group)
+    except ExportError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+
+    stream = export_stream(
+        dataset,
+        fmt,
+        start=_normalize_time(start, "start"),
+        end=_normalize_time(end, "end"),
+        device_ids=selected,
+    )
+    media_type = FORMATS[fmt][0]
+    headers = {"Content-Disposition": f'attachment; filename="{export_filename(dataset, fmt)}"'}
+    return StreamingResponse(stream, media_type=media_type, headers=headers)
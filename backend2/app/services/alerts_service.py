@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import operator
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from ..db import get_alert_rules_collection, get_alerts_collection
+from ..utils.broadcast import Broadcaster
+from .metrics_service import parse_number
+
+_OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+}
+
+_StateKey = Tuple[str, str]
+
+
+@dataclass
+class _SeriesState:
+    pending_since: Optional[datetime] = None
+    alert_id: Optional[ObjectId] = None
+
+
+def extract_series(metric: str, metrics: Dict[str, Any]) -> List[Tuple[str, float]]:
+    """Return the ``(series, value)`` pairs a rule metric yields for one snapshot.
+
+    ``offline`` is 1 when the device was unreachable and 0 otherwise. Disk usage
+    yields one series per mount point; everything else is a single series.
+    """
+    status = metrics.get("status", {})
+    if metric == "offline":
+        return [("", 0.0 if status.get("online") else 1.0)]
+    if not status.get("online"):
+        return []
+
+    if metric == "disk.usedPercent":
+        series = []
+        for fs in metrics.get("disk", {}).get("filesystems", []):
+            value = parse_number(fs.get("usedPercent"))
+            if value is not None:
+                series.append((fs.get("mountedOn") or fs.get("filesystem", ""), value))
+        return series
+
+    section, _, field = metric.partition(".")
+    value = parse_number(metrics.get(section, {}).get(field))
+    return [("", value)] if value is not None else []
+
+
+def serialize_rule(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc.get("_id")),
+        "name": doc.get("name"),
+        "metric": doc.get("metric"),
+        "operator": doc.get("operator"),
+        "threshold": doc.get("threshold"),
+        "forSeconds": doc.get("forSeconds", 0),
+        "deviceId": doc.get("deviceId"),
+        "group": doc.get("group"),
+        "enabled": doc.get("enabled", True),
+        "createdAt": doc.get("createdAt"),
+    }
+
+
+def serialize_alert(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc.get("_id")),
+        "ruleId": doc.get("ruleId"),
+        "ruleName": doc.get("ruleName"),
+        "deviceId": doc.get("deviceId"),
+        "deviceName": doc.get("deviceName"),
+        "metric": doc.get("metric"),
+        "series": doc.get("series", ""),
+        "operator": doc.get("operator"),
+        "threshold": doc.get("threshold"),
+        "value": doc.get("value"),
+        "state": doc.get("state"),
+        "pendingSince": doc.get("pendingSince"),
+        "firedAt": doc.get("firedAt"),
+        "resolvedAt": doc.get("resolvedAt"),
+    }
+
+
+class AlertEngine:
+    """In-process threshold rules evaluated incrementally on each metrics snapshot.
+
+    Each (rule, device, series) keeps only the time its condition started holding,
+    so a ``forSeconds`` window is checked in O(1) per sample without reading
+    history. Only firing/resolved transitions are written to Mongo.
+
+    Series missing from an online device's snapshot (an unmounted filesystem, a
+    rule that no longer applies) are resolved and forgotten. While a device is
+    offline its metric series are held as they were, so alerts raised before it
+    dropped off stay firing until it reports again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._rules: Optional[List[Dict[str, Any]]] = None
+        # device id -> (rule id, series) -> state
+        self._states: Dict[str, Dict[_StateKey, _SeriesState]] = {}
+        self._hydrated = False
+        self.broadcaster = Broadcaster()
+
+    def reload_rules(self) -> None:
+        with self._lock:
+            self._rules = None
+
+    def remove_rule(self, rule_id: str) -> None:
+        with self._lock:
+            self._rules = None
+        self._close_alerts({"ruleId": rule_id}, lambda device_id, key: key[0] == rule_id)
+
+    def remove_device(self, device_id: str) -> None:
+        self._close_alerts({"deviceId": device_id}, lambda state_device_id, key: state_device_id == device_id)
+
+    def evaluate(self, device: Dict[str, Any], metrics: Dict[str, Any], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        now = now or datetime.utcnow()
+        device_id = str(device.get("id"))
+        events: List[Dict[str, Any]] = []
+
+        with self._lock:
+            rules = self._get_rules()
+            device_states = self._states.setdefault(device_id, {})
+            seen = set()
+            for rule in rules:
+                if not self._applies_to(rule, device):
+                    continue
+                compare = _OPERATORS[rule["operator"]]
+                threshold = float(rule["threshold"])
+                for series, value in extract_series(rule["metric"], metrics):
+                    key = (str(rule["_id"]), series)
+                    seen.add(key)
+                    state = device_states.setdefault(key, _SeriesState())
+                    if compare(value, threshold):
+                        if state.pending_since is None:
+                            state.pending_since = now
+                        held = (now - state.pending_since).total_seconds()
+                        if state.alert_id is None and held >= rule.get("forSeconds", 0):
+                            events.append(self._fire(state, rule, device, series, value, now))
+                    else:
+                        if state.alert_id is not None:
+                            events.append(self._resolve(state, now, value))
+                        del device_states[key]
+
+            if metrics.get("status", {}).get("online"):
+                for key in [key for key in device_states if key not in seen]:
+                    state = device_states.pop(key)
+                    if state.alert_id is not None:
+                        events.append(self._resolve(state, now, None))
+            if not device_states:
+                del self._states[device_id]
+
+        self._publish(events)
+        return events
+
+    def _get_rules(self) -> List[Dict[str, Any]]:
+        if not self._hydrated:
+            self._hydrate()
+        if self._rules is None:
+            self._rules = list(get_alert_rules_collection().find({"enabled": True}))
+        return self._rules
+
+    def _hydrate(self) -> None:
+        for doc in get_alerts_collection().find({"state": "firing"}):
+            pending = doc.get("pendingSince") or doc.get("firedAt")
+            key = (doc["ruleId"], doc.get("series", ""))
+            self._states.setdefault(doc["deviceId"], {})[key] = _SeriesState(
+                pending_since=datetime.fromisoformat(pending) if pending else None,
+                alert_id=doc["_id"],
+            )
+        self._hydrated = True
+
+    @staticmethod
+    def _applies_to(rule: Dict[str, Any], device: Dict[str, Any]) -> bool:
+        if rule.get("deviceId") and rule["deviceId"] != str(device.get("id")):
+            return False
+        if rule.get("group") and rule["group"] != device.get("group"):
+            return False
+        return True
+
+    def _fire(
+        self,
+        state: _SeriesState,
+        rule: Dict[str, Any],
+        device: Dict[str, Any],
+        series: str,
+        value: float,
+        now: datetime,
+    ) -> Dict[str, Any]:
+        doc = {
+            "ruleId": str(rule["_id"]),
+            "ruleName": rule.get("name"),
+            "deviceId": str(device.get("id")),
+            "deviceName": device.get("name"),
+            "metric": rule["metric"],
+            "series": series,
+            "operator": rule["operator"],
+            "threshold": rule["threshold"],
+            "value": value,
+            "state": "firing",
+            "pendingSince": state.pending_since.isoformat() if state.pending_since else None,
+            "firedAt": now.isoformat(),
+            "resolvedAt": None,
+        }
+        state.alert_id = get_alerts_collection().insert_one(doc).inserted_id
+        return {"type": "alert", "data": serialize_alert(doc)}
+
+    def _close_alerts(self, query: Dict[str, Any], matches: Callable[[str, _StateKey], bool]) -> None:
+        # Resolve in Mongo rather than from ``_states``, which may not be hydrated yet.
+        collection = get_alerts_collection()
+        with self._lock:
+            for device_id in list(self._states):
+                device_states = self._states[device_id]
+                for key in [key for key in device_states if matches(device_id, key)]:
+                    del device_states[key]
+                if not device_states:
+                    del self._states[device_id]
+            ids = [doc["_id"] for doc in collection.find({**query, "state": "firing"}, {"_id": 1})]
+            events: List[Dict[str, Any]] = []
+            if ids:
+                update = {"state": "resolved", "resolvedAt": datetime.utcnow().isoformat()}
+                collection.update_many({"_id": {"$in": ids}}, {"$set": update})
+                events = [{"type": "alert", "data": serialize_alert(doc)} for doc in collection.find({"_id": {"$in": ids}})]
+        self._publish(events)
+
+    def _resolve(self, state: _SeriesState, now: datetime, value: Optional[float]) -> Dict[str, Any]:
+        update: Dict[str, Any] = {"state": "resolved", "resolvedAt": now.isoformat()}
+        if value is not None:
+            update["value"] = value
+        collection = get_alerts_collection()
+        collection.update_one({"_id": state.alert_id}, {"$set": update})
+        doc = collection.find_one({"_id": state.alert_id}) or {"_id": state.alert_id, **update}
+        state.alert_id = None
+        state.pending_since = None
+        return {"type": "alert", "data": serialize_alert(doc)}
+
+    def _publish(self, events: List[Dict[str, Any]]) -> None:
+        for event in events:
+            self.broadcaster.publish(event)
+
+
+@lru_cache
+def get_alert_engine() -> AlertEngine:
+    return AlertEngine()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+
+from ..config import get_settings
+from ..db import get_devices_collection, get_metric_samples_collection
+from .alerts_service import get_alert_engine
+from .logs_service import collect_new_logs
+from .metrics_service import build_metric_sample, collect_metrics
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def serialize_device(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc.get("_id")),
+        "name": doc.get("name"),
+        "host": doc.get("host"),
+        "port": doc.get("port"),
+        "username": doc.get("username"),
+        "password": doc.get("password"),
+        "description": doc.get("description", ""),
+        "group": doc.get("group", ""),
+        "createdAt": doc.get("createdAt"),
+        "updatedAt": doc.get("updatedAt"),
+        "status": doc.get("status", "unknown"),
+        "lastSeen": doc.get("lastSeen"),
+    }
+
+
+class MetricsCollector:
+    """Collects metrics from every device on a fixed interval in a background thread.
+
+    Each snapshot updates the device status, is stored as a sample and is fed to
+    the alert engine; the latest one per device is kept for the metrics route.
+    Reachable devices also have any new log lines stored.
+    """
+
+    def __init__(self, interval: float, workers: int) -> None:
+        self._interval = interval
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="metrics-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def latest(self, device_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._latest.get(device_id)
+
+    def forget(self, device_id: str) -> None:
+        with self._lock:
+            self._latest.pop(device_id, None)
+
+    def collect_device(self, device: Dict[str, Any]) -> Dict[str, Any]:
+        metrics = collect_metrics(device)
+
+        status_payload = metrics.get("status", {})
+        update_doc = {
+            "status": "online" if status_payload.get("online") else "offline",
+            "lastSeen": status_payload.get("lastSeen"),
+            "updatedAt": datetime.utcnow().isoformat(),
+        }
+        result = get_devices_collection().update_one({"_id": ObjectId(device["id"])}, {"$set": update_doc})
+        if result.matched_count == 0:
+            # Deleted while this cycle was running.
+            return metrics
+        get_metric_samples_collection().insert_one(build_metric_sample(device, metrics))
+        with self._lock:
+            self._latest[device["id"]] = metrics
+        get_alert_engine().evaluate(device, metrics)
+        if status_payload.get("online"):
+            collect_new_logs(device)
+        return metrics
+
+    def _collect_safely(self, device: Dict[str, Any]) -> None:
+        try:
+            self.collect_device(device)
+        except Exception:
+            logger.exception("Metrics collection failed for device %s", device.get("id"))
+
+    def _loop(self) -> None:
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="collector") as pool:
+            while not self._stop.is_set():
+                started = time.monotonic()
+                try:
+                    devices = [serialize_device(doc) for doc in get_devices_collection().find()]
+                    list(pool.map(self._collect_safely, devices))
+                except Exception:
+                    logger.exception("Metrics collection cycle failed")
+                self._stop.wait(max(0.0, self._interval - (time.monotonic() - started)))
+
+
+@lru_cache
+def get_metrics_collector() -> MetricsCollector:
+    return MetricsCollector(settings.metrics_interval_seconds, settings.collector_workers)
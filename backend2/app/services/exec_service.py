@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from ..config import get_settings
+from ..db import get_exec_jobs_collection
+from ..utils.broadcast import Broadcaster
+from ..utils.ssh import SSHError, stream_ssh_command
+
+settings = get_settings()
+
+
+def serialize_job(doc: Dict[str, Any], include_results: bool = True) -> Dict[str, Any]:
+    job = {
+        "id": str(doc.get("_id")),
+        "command": doc.get("command"),
+        "deviceIds": doc.get("deviceIds", []),
+        "group": doc.get("group"),
+        "parallelism": doc.get("parallelism"),
+        "timeoutSeconds": doc.get("timeoutSeconds"),
+        "batchSize": doc.get("batchSize"),
+        "stopOnFailure": doc.get("stopOnFailure", False),
+        "status": doc.get("status"),
+        "error": doc.get("error"),
+        "total": doc.get("total", 0),
+        "completed": doc.get("completed", 0),
+        "failed": doc.get("failed", 0),
+        "createdAt": doc.get("createdAt"),
+        "startedAt": doc.get("startedAt"),
+        "finishedAt": doc.get("finishedAt"),
+    }
+    if include_results:
+        job["results"] = list(doc.get("results", {}).values())
+    return job
+
+
+def find_job(job_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        return get_exec_jobs_collection().find_one({"_id": ObjectId(job_id)})
+    except Exception:
+        return None
+
+
+class _OutputBuffer:
+    def __init__(self, limit: int) -> None:
+        self._limit = limit
+        self._size = 0
+        self._chunks: List[str] = []
+        self.truncated = False
+
+    def append(self, text: str) -> None:
+        room = self._limit - self._size
+        if room <= 0:
+            self.truncated = True
+            return
+        if len(text) > room:
+            text = text[:room]
+            self.truncated = True
+        self._chunks.append(text)
+        self._size += len(text)
+
+    def getvalue(self) -> str:
+        return "".join(self._chunks)
+
+
+class ExecJobRunner:
+    """Runs a command across devices on a background thread with bounded parallelism.
+
+    Per-host output is published to the job's broadcaster as it arrives and each
+    host's result is written to the job document as soon as that host finishes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._broadcasters: Dict[str, Broadcaster] = {}
+
+    def get_broadcaster(self, job_id: str) -> Optional[Broadcaster]:
+        with self._lock:
+            return self._broadcasters.get(job_id)
+
+    def start(self, job: Dict[str, Any], devices: List[Dict[str, Any]]) -> None:
+        job_id = str(job["_id"])
+        broadcaster = Broadcaster(maxsize=4096)
+        with self._lock:
+            self._broadcasters[job_id] = broadcaster
+        thread = threading.Thread(
+            target=self._run,
+            args=(job, devices, broadcaster),
+            name=f"exec-job-{job_id}",
+            daemon=True,
+        )
+        thread.start()
+
+    def _run(self, job: Dict[str, Any], devices: List[Dict[str, Any]], broadcaster: Broadcaster) -> None:
+        collection = get_exec_jobs_collection()
+        job_id = str(job["_id"])
+        update: Dict[str, Any] = {"status": "completed"}
+        try:
+            collection.update_one(
+                {"_id": job["_id"]},
+                {"$set": {"status": "running", "startedAt": datetime.utcnow().isoformat()}},
+            )
+            batch_size = job.get("batchSize") or len(devices) or 1
+            with ThreadPoolExecutor(max_workers=job["parallelism"]) as pool:
+                for start in range(0, len(devices), batch_size):
+                    batch = devices[start:start + batch_size]
+                    results = list(pool.map(lambda device: self._run_host(job, device, broadcaster), batch))
+                    failed = any(result["exitCode"] != 0 for result in results)
+                    if failed and job.get("stopOnFailure") and start + batch_size < len(devices):
+                        update = {"status": "aborted", "error": "Stopped after a failed batch"}
+                        break
+        except Exception as exc:
+            update = {"status": "failed", "error": str(exc)}
+        finally:
+            update["finishedAt"] = datetime.utcnow().isoformat()
+            try:
+                collection.update_one({"_id": job["_id"]}, {"$set": update})
+            finally:
+                broadcaster.publish({"type": "status", "jobId": job_id, **update}, terminal=True)
+                with self._lock:
+                    self._broadcasters.pop(job_id, None)
+
+    def _run_host(self, job: Dict[str, Any], device: Dict[str, Any], broadcaster: Broadcaster) -> Dict[str, Any]:
+        device_id = device["id"]
+        buffers = {
+            "stdout": _OutputBuffer(settings.exec_output_limit),
+            "stderr": _OutputBuffer(settings.exec_output_limit),
+        }
+
+        def on_output(stream: str, data: str) -> None:
+            buffers[stream].append(data)
+            broadcaster.publish({"type": "output", "deviceId": device_id, "stream": stream, "data": data})
+
+        started_at = datetime.utcnow().isoformat()
+        exit_code: Optional[int] = None
+        error: Optional[str] = None
+        try:
+            exit_code = stream_ssh_command(device, job["command"], job["timeoutSeconds"], on_output)
+        except SSHError as exc:
+            error = str(exc)
+
+        result = {
+            "deviceId": device_id,
+            "deviceName": device.get("name"),
+            "host": device.get("host"),
+            "exitCode": exit_code,
+            "error": error,
+            "stdout": buffers["stdout"].getvalue(),
+            "stderr": buffers["stderr"].getvalue(),
+            "truncated": buffers["stdout"].truncated or buffers["stderr"].truncated,
+            "startedAt": started_at,
+            "finishedAt": datetime.utcnow().isoformat(),
+        }
+        get_exec_jobs_collection().update_one(
+            {"_id": job["_id"]},
+            {"$set": {f"results.{device_id}": result}, "$inc": {"completed": 1, "failed": int(exit_code != 0)}},
+        )
+        broadcaster.publish({"type": "exit", "deviceId": device_id, "exitCode": exit_code, "error": error})
+        return result
+
+
+@lru_cache
+def get_exec_runner() -> ExecJobRunner:
+    return ExecJobRunner()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import io
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional
+
+from pymongo.collection import Collection
+
+from ..db import get_device_logs_collection, get_devices_collection, get_metric_samples_collection
+
+if TYPE_CHECKING:
+    import pyarrow
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional columnar support
+    pa = pa_ipc = pq = None
+
+_PYARROW_MISSING = "Columnar export requires pyarrow; use 'ndjson' instead"
+
+BATCH_ROWS = 10000
+
+DATASETS: Dict[str, List[tuple]] = {
+    "metrics": [
+        ("deviceId", "string"),
+        ("deviceName", "string"),
+        ("timestamp", "timestamp"),
+        ("online", "bool"),
+        ("cpuUsedPercent", "float"),
+        ("cpuUserPercent", "float"),
+        ("cpuSystemPercent", "float"),
+        ("load1", "float"),
+        ("load5", "float"),
+        ("load15", "float"),
+        ("memoryUsedPercent", "float"),
+        ("diskMaxUsedPercent", "float"),
+    ],
+    "logs": [
+        ("deviceId", "string"),
+        ("deviceName", "string"),
+        ("timestamp", "timestamp"),
+        ("level", "string"),
+        ("message", "string"),
+    ],
+}
+
+FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "ndjson": ("application/gzip", "ndjson.gz"),
+}
+
+
+class ExportError(Exception):
+    pass
+
+
+def columnar_available() -> bool:
+    return pa is not None
+
+
+def resolve_format(requested: Optional[str]) -> str:
+    if requested is None:
+        return "parquet" if columnar_available() else "ndjson"
+    if requested not in FORMATS:
+        raise ExportError(f"Unsupported format '{requested}'")
+    if requested != "ndjson" and not columnar_available():
+        raise ExportError(_PYARROW_MISSING)
+    return requested
+
+
+def parse_time(value: str) -> str:
+    """Parse an ISO filter bound into the naive UTC form stored timestamps use.
+
+    Values with an offset are converted to UTC; naive values are taken as UTC.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"Invalid ISO timestamp '{value}'")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def resolve_device_ids(device_ids: Optional[List[str]], group: Optional[str]) -> Optional[List[str]]:
+    """Combine explicit device ids with the members of ``group``; ``None`` means every device."""
+    selected = list(device_ids or [])
+    if group:
+        cursor = get_devices_collection().find({"group": group}, {"_id": 1})
+        selected.extend(str(doc["_id"]) for doc in cursor)
+        if not selected:
+            raise ExportError(f"No devices in group '{group}'")
+    return selected or None
+
+
+def _collection(dataset: str) -> Collection:
+    if dataset == "metrics":
+        return get_metric_samples_collection()
+    if dataset == "logs":
+        return get_device_logs_collection()
+    raise ExportError(f"Unknown dataset '{dataset}'")
+
+
+def iter_rows(
+    dataset: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    device_ids: Optional[List[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream stored rows in timestamp order straight from a Mongo cursor."""
+    collection = _collection(dataset)
+    query: Dict[str, Any] = {}
+    if start or end:
+        query["timestamp"] = {}
+        if start:
+            query["timestamp"]["$gte"] = start
+        if end:
+            query["timestamp"]["$lt"] = end
+    if device_ids:
+        query["deviceId"] = {"$in": device_ids}
+
+    projection = {name: 1 for name, _ in DATASETS[dataset]}
+    projection["_id"] = 0
+    cursor = collection.find(query, projection).sort("timestamp", 1).batch_size(BATCH_ROWS)
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
+
+
+def _batched(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands buffered bytes back to the caller on ``drain``."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        return len(chunk)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema(dataset: str) -> pyarrow.Schema:
+    if pa is None:
+        raise ExportError(_PYARROW_MISSING)
+    types = {
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us"),
+        "bool": pa.bool_(),
+        "float": pa.float64(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in DATASETS[dataset]])
+
+
+def _to_record_batch(batch: List[Dict[str, Any]], dataset: str, schema: pyarrow.Schema) -> pyarrow.RecordBatch:
+    if pa is None:
+        raise ExportError(_PYARROW_MISSING)
+    columns = []
+    for name, kind in DATASETS[dataset]:
+        values = [row.get(name) for row in batch]
+        if kind == "timestamp":
+            values = [datetime.fromisoformat(value) if value else None for value in values]
+        columns.append(values)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def _iter_columnar(rows: Iterable[Dict[str, Any]], dataset: str, fmt: str) -> Iterator[bytes]:
+    if pq is None or pa_ipc is None:
+        raise ExportError(_PYARROW_MISSING)
+    schema = _arrow_schema(dataset)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa_ipc.new_stream(sink, schema, options=pa_ipc.IpcWriteOptions(compression="zstd"))
+    try:
+        for batch in _batched(rows, BATCH_ROWS):
+            writer.write_batch(_to_record_batch(batch, dataset, schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _iter_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for batch in _batched(rows, BATCH_ROWS):
+        payload = "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in batch)
+        chunk = compressor.compress(payload.encode("utf-8"))
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def export_stream(
+    dataset: str,
+    fmt: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    device_ids: Optional[List[str]] = None,
+) -> Iterator[bytes]:
+    """Encode stored rows as compressed chunks, holding at most one batch in memory."""
+    if dataset not in DATASETS:
+        raise ExportError(f"Unknown dataset '{dataset}'")
+    rows = iter_rows(dataset, start, end, device_ids)
+    if fmt == "ndjson":
+        return _iter_ndjson(rows)
+    if not columnar_available():
+        raise ExportError(_PYARROW_MISSING)
+    return _iter_columnar(rows, dataset, fmt)
+
+
+def export_filename(dataset: str, fmt: str) -> str:
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    return f"{dataset}-{stamp}.{FORMATS[fmt][1]}"
@@ -1,10 +1,25 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, Dict, List
+import shlex
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
+from bson import ObjectId
+
+from ..db import get_device_logs_collection, get_devices_collection
 from ..utils.ssh import SSHError, execute_ssh_command
 
+_CURSOR_PREFIX = "-- cursor: "
+
+
+def _log_level(line: str) -> str:
+    lower = line.lower()
+    if "error" in lower or "fail" in lower:
+        return "error"
+    if "warn" in lower:
+        return "warning"
+    return "info"
+
 
 def fetch_logs(device: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
     commands = [
@@ -26,17 +41,90 @@ def fetch_logs(device: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
     for line in output.splitlines():
         if not line.strip():
             continue
-        level = "info"
-        lower = line.lower()
-        if "error" in lower or "fail" in lower:
-            level = "error"
-        elif "warn" in lower:
-            level = "warning"
         logs.append(
             {
-                "level": level,
+                "level": _log_level(line),
                 "message": line.strip(),
                 "timestamp": datetime.utcnow().isoformat(),
             }
         )
     return {"logs": logs[-50:]}
+
+
+def _parse_log_time(value: str) -> Optional[str]:
+    """Normalise a device log timestamp to the naive UTC ISO form stored everywhere else."""
+    value = value.replace(",", ".")
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z"):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        return parsed.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+    return None
+
+
+def _parse_timestamped_lines(output: str) -> List[Dict[str, Any]]:
+    entries = []
+    for line in output.splitlines():
+        stamp, _, message = line.strip().partition(" ")
+        timestamp = _parse_log_time(stamp)
+        if timestamp is None or not message.strip():
+            continue
+        entries.append({"level": _log_level(message), "message": message.strip(), "timestamp": timestamp})
+    return entries
+
+
+def _read_journal(device: Dict[str, Any], position: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    command = "journalctl --no-pager -o short-iso-precise --show-cursor"
+    command += f" --after-cursor={shlex.quote(position)}" if position else " -n 200"
+    output = execute_ssh_command(device, command)
+    cursor_lines = [line for line in output.splitlines() if line.startswith(_CURSOR_PREFIX)]
+    next_position = cursor_lines[-1][len(_CURSOR_PREFIX):].strip() if cursor_lines else None
+    return _parse_timestamped_lines(output), next_position
+
+
+def _read_dmesg(device: Dict[str, Any], position: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    entries = _parse_timestamped_lines(execute_ssh_command(device, "dmesg --time-format iso"))
+    if position:
+        entries = [entry for entry in entries if entry["timestamp"] > position]
+    return entries, max((entry["timestamp"] for entry in entries), default=position)
+
+
+def collect_new_logs(device: Dict[str, Any]) -> int:
+    """Store log lines logged since the previous call, tracked by a per-device cursor.
+
+    The systemd journal cursor is used when available, otherwise the timestamp of
+    the last stored ``dmesg`` line. Devices offering neither are skipped.
+    """
+    devices = get_devices_collection()
+    doc = devices.find_one({"_id": ObjectId(device["id"])}, {"logCursor": 1}) or {}
+    cursor = doc.get("logCursor") or {}
+    source = cursor.get("source")
+    if source == "unsupported":
+        return 0
+
+    try:
+        entries: List[Dict[str, Any]] = []
+        position: Optional[str] = None
+        if source in (None, "journal"):
+            entries, position = _read_journal(device, cursor.get("position") if source == "journal" else None)
+            if position or source == "journal":
+                source = "journal"
+        if source != "journal":
+            entries, position = _read_dmesg(device, cursor.get("position") if source == "dmesg" else None)
+            source = "dmesg" if position else "unsupported"
+    except SSHError:
+        return 0
+
+    if entries:
+        recorded_at = datetime.utcnow()
+        get_device_logs_collection().insert_many(
+            [
+                {"deviceId": device["id"], "deviceName": device.get("name"), "source": source, "recordedAt": recorded_at, **entry}
+                for entry in entries
+            ]
+        )
+    new_cursor = {"source": source, "position": position or cursor.get("position")}
+    if new_cursor != cursor:
+        devices.update_one({"_id": ObjectId(device["id"])}, {"$set": {"logCursor": new_cursor}})
+    return len(entries)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from ..utils.ssh import (
     SSHError,
@@ -11,6 +11,18 @@ from ..utils.ssh import (
 )
 
 
+def parse_number(value: Any) -> Optional[float]:
+    """Turn a formatted metric such as ``"42%"`` or ``"0.15"`` back into a float."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    try:
+        return float(value.strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
 def _parse_linux_memory(output: str) -> Dict[str, Any]:
     lines = output.splitlines()
     for line in lines:
@@ -273,3 +285,26 @@ def collect_metrics(device: Dict[str, Any]) -> Dict[str, Any]:
             "status": {"online": False, "error": str(exc)},
             "timestamp": datetime.utcnow().isoformat(),
         }
+
+
+def build_metric_sample(device: Dict[str, Any], metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a collected snapshot into the numeric row stored for history and export."""
+    cpu = metrics.get("cpu", {})
+    load = cpu.get("loadAverage", {})
+    disk_usage = [parse_number(fs.get("usedPercent")) for fs in metrics.get("disk", {}).get("filesystems", [])]
+    disk_usage = [value for value in disk_usage if value is not None]
+    return {
+        "deviceId": str(device.get("id")),
+        "deviceName": device.get("name"),
+        "timestamp": metrics.get("timestamp") or datetime.utcnow().isoformat(),
+        "online": bool(metrics.get("status", {}).get("online")),
+        "cpuUsedPercent": parse_number(cpu.get("usedPercent")),
+        "cpuUserPercent": parse_number(cpu.get("userPercent")),
+        "cpuSystemPercent": parse_number(cpu.get("systemPercent")),
+        "load1": parse_number(load.get("1min")),
+        "load5": parse_number(load.get("5min")),
+        "load15": parse_number(load.get("15min")),
+        "memoryUsedPercent": parse_number(metrics.get("memory", {}).get("usedPercent")),
+        "diskMaxUsedPercent": max(disk_usage) if disk_usage else None,
+        "recordedAt": datetime.utcnow(),
+    }
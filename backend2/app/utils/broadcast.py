@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Dict, List, Tuple
+
+
+class _SubscriberQueue(asyncio.Queue):
+    dropped = 0
+
+
+class Broadcaster:
+    """Fan events out to websocket queues; ``publish`` is safe to call from worker threads.
+
+    A subscriber that falls behind loses events, but receives a ``dropped`` marker
+    with the count in their place. ``terminal`` events are never dropped; the
+    oldest queued events are evicted to make room for them.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, _SubscriberQueue]] = []
+
+    def subscribe(self) -> _SubscriberQueue:
+        queue = _SubscriberQueue(maxsize=max(self._maxsize, 2))
+        with self._lock:
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = [sub for sub in self._subscribers if sub[1] is not queue]
+
+    def publish(self, event: Dict[str, Any], terminal: bool = False) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event, terminal)
+            except RuntimeError:
+                continue
+
+
+def _offer(queue: _SubscriberQueue, event: Dict[str, Any], terminal: bool) -> None:
+    # Runs on the subscriber's event loop, so the queue is never touched concurrently.
+    needed = 2 if queue.dropped or terminal else 1
+    if terminal:
+        while queue.maxsize - queue.qsize() < needed:
+            queue.get_nowait()
+            queue.dropped += 1
+    elif queue.maxsize - queue.qsize() < needed:
+        queue.dropped += 1
+        return
+    if queue.dropped:
+        queue.put_nowait({"type": "dropped", "count": queue.dropped})
+        queue.dropped = 0
+    queue.put_nowait(event)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import codecs
 import socket
+import time
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 import paramiko
 
@@ -76,3 +78,60 @@ def check_device_status(device: Dict[str, Any]) -> Dict[str, Any]:
         return {"online": True, "lastSeen": datetime.utcnow().isoformat()}
     except SSHError as exc:
         return {"online": False, "error": str(exc), "lastSeen": None}
+
+
+def stream_ssh_command(
+    device: Dict[str, Any],
+    command: str,
+    timeout: float,
+    on_output: Callable[[str, str], None],
+) -> int:
+    """Run ``command`` and hand stdout/stderr chunks to ``on_output`` as they arrive.
+
+    Returns the remote exit code; raises ``SSHError`` if the command outlives ``timeout``.
+    """
+    client = None
+    try:
+        client = create_ssh_client(device)
+        transport = client.get_transport()
+        if transport is None:
+            raise SSHError("SSH transport is not available")
+        channel = transport.open_session()
+        channel.exec_command(command)
+        decoders = {
+            "stdout": codecs.getincrementaldecoder("utf-8")("ignore"),
+            "stderr": codecs.getincrementaldecoder("utf-8")("ignore"),
+        }
+
+        def emit(stream: str, data: bytes, final: bool = False) -> None:
+            text = decoders[stream].decode(data, final)
+            if text:
+                on_output(stream, text)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            # Sample the exit status before reading: output always precedes it on the
+            # channel, so an empty read after the command exited means nothing is left.
+            exited = channel.exit_status_ready()
+            received = False
+            if channel.recv_ready():
+                emit("stdout", channel.recv(4096))
+                received = True
+            if channel.recv_stderr_ready():
+                emit("stderr", channel.recv_stderr(4096))
+                received = True
+            if time.monotonic() > deadline:
+                channel.close()
+                raise SSHError(f"Command timed out after {timeout:g}s")
+            if not received:
+                if exited:
+                    break
+                time.sleep(0.05)
+        emit("stdout", b"", final=True)
+        emit("stderr", b"", final=True)
+        return channel.recv_exit_status()
+    except (socket.error, paramiko.SSHException) as exc:
+        raise SSHError(str(exc)) from exc
+    finally:
+        if client:
+            client.close()